@@ -4,16 +4,25 @@ import queue
 import socket
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import RequestException
 from .const import (
     ENDPOINTS,
     STATE_UNKNOWN, STATE_PLAYING, STATE_PAUSED, STATE_IDLE
 )
+from .albumart import AlbumArtCache
+from .cache import ResponseCache, response_cache
+from .dispatcher import Dispatcher, MAX_QUEUE
+from .events import MediaStatusChanged, PlaybackChanged
 from .helpers import request, message_worker, socket_worker
 from .media_status import MediaStatus
 from .exceptions import YMCInitError
 from .zone import Zone
 
+__all__ = ['McDevice', 'Zone', 'MediaStatus', 'AlbumArtCache',
+           'ResponseCache', 'response_cache', 'YMCInitError',
+           'refresh_devices']
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -27,10 +36,17 @@ class McDevice(object):
         self._ip_address = ip_address
         self._udp_port = udp_port
         self._interval = kwargs.get('mc_interval', 480)
+        self._album_art_cache = kwargs.get('album_art_cache')
+        self._dispatcher = Dispatcher(
+            kwargs.get('executor'), kwargs.get('max_queue', MAX_QUEUE))
+        self._lock = threading.RLock()  # serializes state updates
+        self._deferred_events = None
         self._zones = {}
         self._yamaha = None
         self._socket = None
         self._name = None
+        self.media_status = None
+        self.playback_status = None
         self.device_id = None
         self.device_info = None
         self.device_features = None
@@ -47,6 +63,11 @@ class McDevice(object):
         """Returns the ip_address."""
         return self._ip_address
 
+    @property
+    def album_art_cache(self):
+        """Returns the album art cache."""
+        return self._album_art_cache
+
     @property
     def zones(self):
         """Returns receiver zones."""
@@ -165,43 +186,83 @@ class McDevice(object):
 
         if status:
             # Update main-zone
-            self.zones['main'].update_status(status)
+            with self._lock:
+                self.zones['main'].update_status(status)
 
     def handle_netusb(self, message):
         """Handles 'netusb' in message"""
         # _LOGGER.debug("message: {}".format(message))
         needs_update = 0
 
-        if self._yamaha:
+        if self._yamaha or self._dispatcher.subscriptions:
             if 'play_info_updated' in message:
                 play_info = self.get_play_info()
                 # _LOGGER.debug(play_info)
                 if play_info:
-                    new_media_status = MediaStatus(play_info, self._ip_address)
-
-                    if self._yamaha.media_status != new_media_status:
-                        # we need to send an update upwards
-                        self._yamaha.new_media_status(new_media_status)
-                        needs_update += 1
-
-                    playback = play_info.get('playback')
-                    # _LOGGER.debug("Playback: {}".format(playback))
-                    if playback == "play":
-                        new_status = STATE_PLAYING
-                    elif playback == "stop":
-                        new_status = STATE_IDLE
-                    elif playback == "pause":
-                        new_status = STATE_PAUSED
-                    else:
-                        new_status = STATE_UNKNOWN
-
-                    if self._yamaha.status is not new_status:
-                        _LOGGER.debug("playback: %s", new_status)
-                        self._yamaha.status = new_status
-                        needs_update += 1
+                    needs_update += self.handle_play_info(play_info)
+
+        return needs_update
+
+    @staticmethod
+    def update_response_cache(req_url, message):
+        """Keep cached responses in line with UDP events"""
+        if 'status_updated' in message or 'play_info_updated' in message:
+            # device tells us to re-fetch: cached data is stale
+            response_cache.invalidate(req_url)
+        else:
+            response_cache.merge(req_url, {
+                key: value for key, value in message.items()
+                if not key.endswith('_updated')})
+
+    def handle_play_info(self, play_info):
+        """Handles play info of the device"""
+        needs_update = 0
+        new_media_status = MediaStatus(
+            play_info, self._ip_address, self._album_art_cache)
+
+        if self.media_status != new_media_status:
+            self.prefetch_album_art(self.media_status, new_media_status)
+            self.media_status = new_media_status
+            self.publish(MediaStatusChanged(
+                self.device_id, 'netusb', new_media_status))
+
+        if self._yamaha and self._yamaha.media_status != new_media_status:
+            # we need to send an update upwards
+            self._yamaha.new_media_status(new_media_status)
+            needs_update += 1
+
+        playback = play_info.get('playback')
+        # _LOGGER.debug("Playback: {}".format(playback))
+        if playback == "play":
+            new_status = STATE_PLAYING
+        elif playback == "stop":
+            new_status = STATE_IDLE
+        elif playback == "pause":
+            new_status = STATE_PAUSED
+        else:
+            new_status = STATE_UNKNOWN
+
+        if self.playback_status is not new_status:
+            self.playback_status = new_status
+            self.publish(PlaybackChanged(
+                self.device_id, 'netusb', new_status))
+
+        if self._yamaha and self._yamaha.status is not new_status:
+            _LOGGER.debug("playback: %s", new_status)
+            self._yamaha.status = new_status
+            needs_update += 1
 
         return needs_update
 
+    def prefetch_album_art(self, old_media_status, new_media_status):
+        """Warm the album art cache when a new track shows up"""
+        if not self._album_art_cache:
+            return
+        old_url = getattr(old_media_status, 'albumart_url', None)
+        if new_media_status.albumart_url != old_url:
+            self._album_art_cache.prefetch(
+                self._ip_address, new_media_status.albumart_url)
+
     def handle_features(self, device_features):
         """Handles features of the device"""
 
@@ -220,18 +281,87 @@ class McDevice(object):
         """Dispatch all event messages"""
         # _LOGGER.debug(message)
         needs_update = 0
-        for zone in self.zones:
-            if zone in message:
-                _LOGGER.debug("Received message for zone: %s", zone)
-                self.zones[zone].update_status(message[zone])
-
-        if 'netusb' in message:
-            needs_update += self.handle_netusb(message['netusb'])
+        with self._lock:
+            for zone in self.zones:
+                if zone in message:
+                    _LOGGER.debug("Received message for zone: %s", zone)
+                    self.update_response_cache(
+                        ENDPOINTS["getStatus"].format(self._ip_address, zone),
+                        message[zone])
+                    self.zones[zone].update_status(message[zone])
+
+            if 'netusb' in message:
+                self.update_response_cache(
+                    ENDPOINTS["getPlayInfo"].format(self._ip_address),
+                    message['netusb'])
+                needs_update += self.handle_netusb(message['netusb'])
 
         if needs_update > 0:
             _LOGGER.debug("needs_update: %d", needs_update)
             self.update_hass()
 
+    def refresh(self):
+        """Fetch status of all zones and play info concurrently"""
+        with ThreadPoolExecutor(max_workers=len(self.zones) + 1) as pool:
+            self.apply_refresh(self.submit_refresh(pool))
+
+    def submit_refresh(self, pool):
+        """Submit the requests of a full refresh to pool"""
+        futures = {
+            zone_id: pool.submit(
+                self.get_status if zone_id == 'main' else zone.get_status)
+            for zone_id, zone in self.zones.items()}
+        futures['netusb'] = pool.submit(self.get_play_info)
+        return futures
+
+    def apply_refresh(self, futures):
+        """Apply results of submit_refresh, then notify once"""
+        # raises on the first failed request, before anything is applied
+        statuses = {key: future.result() for key, future in futures.items()}
+        play_info = statuses.pop('netusb')
+
+        needs_update = 0
+        with self._lock:
+            self._deferred_events = []
+            try:
+                for zone_id, status in statuses.items():
+                    if status:
+                        self.zones[zone_id].update_status(status, notify=False)
+                if play_info:
+                    needs_update += self.handle_play_info(play_info)
+            finally:
+                events, self._deferred_events = self._deferred_events, None
+            # still under the lock: later UDP events can't overtake these
+            for event in events:
+                self._dispatcher.publish(event)
+
+        main_zone = self.zones.get('main')
+        if needs_update > 0:
+            _LOGGER.debug("needs_update: %d", needs_update)
+            if main_zone and main_zone.yamaha_device is self._yamaha:
+                # one update covers main zone and play info
+                main_zone.send_status(force=True)
+            else:
+                self.update_hass()
+        for zone in self.zones.values():
+            zone.send_status()
+
+    def subscribe(self, callback, event_types=None, zone_id=None):
+        """Subscribe callback to events of this device"""
+        return self._dispatcher.subscribe(callback, event_types, zone_id)
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription"""
+        self._dispatcher.unsubscribe(subscription)
+
+    def publish(self, event):
+        """Publish event to subscribers"""
+        if self._deferred_events is not None:
+            # a refresh is being applied: publish once it is complete
+            self._deferred_events.append(event)
+        else:
+            self._dispatcher.publish(event)
+
     def update_hass(self):
         """Update HASS."""
         return self._yamaha.update_hass() if self._yamaha else False
@@ -279,3 +409,21 @@ class McDevice(object):
         if self._socket:
             _LOGGER.debug("Closing Socket.")
             self._socket.close()
+
+
+def refresh_devices(devices, max_workers=4):
+    """Refresh many devices, with at most max_workers requests in flight.
+
+    Returns a dict of device to exception for every failed refresh."""
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = [
+            (device, device.submit_refresh(pool)) for device in devices]
+        for device, futures in pending:
+            try:
+                device.apply_refresh(futures)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Refresh of %s failed: %s",
+                              device.ip_address, err)
+                errors[device] = err
+    return errors
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""This file defines the AlbumArtCache object."""
+import os
+import re
+import hashlib
+import tempfile
+import logging
+import threading
+from collections import OrderedDict
+import requests
+_LOGGER = logging.getLogger(__name__)
+
+_KEY_RE = re.compile(r'^[0-9a-f]{40}$')   # only files named by make_key
+_TEMP_PREFIX = 'albumart-'
+_TEMP_SUFFIX = '.tmp'
+
+
+class AlbumArtCache(object):
+    """Two-tier (memory/disk) LRU cache for album art images"""
+    def __init__(self, max_bytes=8 * 1024 * 1024,
+                 cache_dir=None, max_disk_bytes=64 * 1024 * 1024,
+                 timeout=10):
+        super(AlbumArtCache, self).__init__()
+        self._max_bytes = max_bytes
+        self._cache_dir = cache_dir
+        self._max_disk_bytes = max_disk_bytes
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()    # key -> image bytes
+        self._memory_bytes = 0
+        self._disk = OrderedDict()      # key -> file size
+        self._disk_bytes = 0
+        self._pending = {}              # key -> [threading.Event, data]
+        if self._cache_dir:
+            self.initialize_disk()
+
+    @staticmethod
+    def make_key(host, albumart_url):
+        """Returns the cache key for an image."""
+        return hashlib.sha1(
+            "{}|{}".format(host, albumart_url).encode("utf-8")).hexdigest()
+
+    def initialize_disk(self):
+        """Load existing disk entries, oldest first"""
+        os.makedirs(self._cache_dir, exist_ok=True)
+        entries = []
+        for name in os.listdir(self._cache_dir):
+            path = os.path.join(self._cache_dir, name)
+            if name.startswith(_TEMP_PREFIX) and name.endswith(_TEMP_SUFFIX):
+                # left over from an interrupted write
+                self._unlink(path)
+            elif _KEY_RE.match(name) and os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name, stat.st_size))
+        with self._lock:
+            for _, name, size in sorted(entries):
+                self._disk[name] = size
+                self._disk_bytes += size
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def get(self, host, albumart_url):
+        """Return image bytes, fetching them on a cache miss"""
+        if not albumart_url:
+            return None
+        key = self.make_key(host, albumart_url)
+
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+            pending = self._pending.get(key)
+            if pending is None:
+                # we are the first: load it ourselves
+                pending = self._pending[key] = [threading.Event(), None]
+                on_disk = key in self._disk
+            else:
+                on_disk = None
+
+        if on_disk is None:
+            # someone else is loading this image already
+            pending[0].wait()
+            return pending[1]
+
+        data = None
+        try:
+            if on_disk:
+                data = self._read_disk(key)
+            if data is None:
+                data = self.fetch(host, albumart_url)
+                if data is not None and self._cache_dir:
+                    self._write_disk(key, data)
+            if data is not None:
+                with self._lock:
+                    self._store_memory(key, data)
+            return data
+        finally:
+            pending[1] = data
+            with self._lock:
+                del self._pending[key]
+            pending[0].set()
+
+    def peek(self, host, albumart_url):
+        """Return image bytes if held in memory, without any I/O"""
+        if not albumart_url:
+            return None
+        key = self.make_key(host, albumart_url)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+            return data
+
+    def prefetch(self, host, albumart_url):
+        """Fetch an image into the cache in the background"""
+        if not albumart_url:
+            return
+        key = self.make_key(host, albumart_url)
+        with self._lock:
+            if key in self._memory or key in self._pending:
+                return
+        thread = threading.Thread(
+            name="AlbumArtThread", target=self.get,
+            args=(host, albumart_url,))
+        thread.setDaemon(True)
+        thread.start()
+
+    def fetch(self, host, albumart_url):
+        """Download image from device"""
+        url = "http://{}{}".format(host, albumart_url)
+        _LOGGER.debug("Fetching album art: %s", url)
+        try:
+            req = requests.get(url, timeout=self._timeout)
+            req.raise_for_status()
+        except requests.exceptions.RequestException as err:
+            _LOGGER.error("Failed to fetch album art: %s", err)
+            return None
+        return req.content
+
+    def clear(self):
+        """Drop all cached images"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            evicted = list(self._disk)
+            self._disk.clear()
+            self._disk_bytes = 0
+        self._remove_files(evicted)
+
+    def _read_disk(self, key):
+        """Read an image from disk tier"""
+        try:
+            with open(os.path.join(self._cache_dir, key), 'rb') as fil:
+                data = fil.read()
+        except OSError as err:
+            _LOGGER.error(err)
+            with self._lock:
+                if key in self._disk:
+                    self._disk_bytes -= self._disk.pop(key)
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        return data
+
+    def _write_disk(self, key, data):
+        """Atomically write an image to disk tier"""
+        if len(data) > self._max_disk_bytes:
+            return
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=_TEMP_PREFIX, suffix=_TEMP_SUFFIX, dir=self._cache_dir)
+            with os.fdopen(fd, 'wb') as fil:
+                fil.write(data)
+            os.replace(tmp_path, os.path.join(self._cache_dir, key))
+        except OSError as err:
+            _LOGGER.error(err)
+            if tmp_path:
+                self._unlink(tmp_path)
+            return
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def _store_memory(self, key, data):
+        """Store data in memory tier. Caller holds the lock."""
+        if len(data) > self._max_bytes:
+            return
+        self._memory_bytes += len(data) - len(self._memory.pop(key, b''))
+        self._memory[key] = data
+        while self._memory_bytes > self._max_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _evict_disk(self):
+        """Drop least recently used entries from the disk index and
+        return their keys. Caller holds the lock."""
+        evicted = []
+        while self._disk_bytes > self._max_disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def _remove_files(self, keys):
+        """Remove files of evicted entries"""
+        for key in keys:
+            self._unlink(os.path.join(self._cache_dir, key))
+
+    @staticmethod
+    def _unlink(path):
+        """Remove a file, ignoring missing ones"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            _LOGGER.error(err)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""This file defines the ResponseCache object."""
+import copy
+import time
+import logging
+import threading
+_LOGGER = logging.getLogger(__name__)
+
+# setters that also change state outside of their own endpoint group
+RELATED_GROUPS = {
+    'setInput': 'netusb',
+}
+
+
+class ResponseCache(object):
+    """Short-lived read-through cache for GET responses"""
+    def __init__(self, ttl=1.0):
+        super(ResponseCache, self).__init__()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}      # url -> (expires, data)
+        self._pending = {}      # url -> [threading.Event, data, error]
+        self._generations = {}  # url -> invalidation counter
+
+    @property
+    def hit_rate(self):
+        """Share of lookups answered from cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def is_cacheable(url):
+        """Only getters are cached, e.g. getStatus or getPlayInfo."""
+        return url.rsplit('/', 1)[-1].startswith('get')
+
+    def generation(self, url):
+        """Returns the invalidation counter of url."""
+        with self._lock:
+            return self._generations.setdefault(url, 0)
+
+    def get(self, url, fetch):
+        """Return cached data for url, calling fetch() on a miss"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            pending = self._pending.get(url)
+            if pending is None:
+                self.misses += 1
+                pending = self._pending[url] = [threading.Event(), None, None]
+                generation = self._generations.setdefault(url, 0)
+            else:
+                # coalesced requests don't reach the device either
+                self.hits += 1
+                generation = None
+
+        if generation is None:
+            # an identical request is in flight: share its outcome
+            pending[0].wait()
+            if pending[2] is not None:
+                raise pending[2]
+            return copy.deepcopy(pending[1])
+
+        try:
+            data = fetch()
+        except Exception as err:
+            pending[2] = err
+            raise
+        else:
+            pending[1] = data
+            self.set(url, data, generation)
+            return copy.deepcopy(data)
+        finally:
+            with self._lock:
+                if self._pending.get(url) is pending:
+                    del self._pending[url]
+            pending[0].set()
+
+    def set(self, url, data, generation=None):
+        """Store data for url, unless invalidated since generation"""
+        with self._lock:
+            current = self._generations.setdefault(url, 0)
+            if generation is not None and generation != current:
+                # fetched before a setter changed the device: stale
+                return
+            self._entries[url] = (
+                time.monotonic() + self.ttl, copy.deepcopy(data))
+
+    def merge(self, url, data):
+        """Merge partial data, e.g. from UDP events, into cached entry"""
+        with self._lock:
+            entry = self._entries.get(url)
+            # a fetch still in flight predates this update: don't store it
+            self._outdate(url)
+            if entry:
+                entry[1].update(copy.deepcopy(data))
+
+    def invalidate(self, url):
+        """Drop the cached entry for url"""
+        with self._lock:
+            self._invalidate(url)
+
+    def invalidate_group(self, url):
+        """Drop entries affected by the setter url, i.e. its endpoint
+        group (zone, netusb) plus groups listed in RELATED_GROUPS"""
+        base, name = url.rsplit('/', 1)
+        prefixes = [base + '/']
+        if name in RELATED_GROUPS:
+            prefixes.append(
+                "{}/{}/".format(base.rsplit('/', 1)[0], RELATED_GROUPS[name]))
+        with self._lock:
+            keys = set(self._entries) | set(self._generations)
+            for key in keys:
+                if key.startswith(tuple(prefixes)):
+                    self._invalidate(key)
+
+    def clear(self):
+        """Drop all entries and reset statistics"""
+        with self._lock:
+            for key in list(self._entries):
+                self._invalidate(key)
+            self.hits = 0
+            self.misses = 0
+
+    def _invalidate(self, url):
+        """Drop entry and outdate in-flight fetches. Caller holds the lock."""
+        self._entries.pop(url, None)
+        self._outdate(url)
+
+    def _outdate(self, url):
+        """Keep in-flight fetches from being stored. Caller holds the lock."""
+        self._generations[url] = self._generations.get(url, 0) + 1
+        # later callers must not join a fetch that started before this
+        self._pending.pop(url, None)
+
+
+response_cache = ResponseCache()  # pylint: disable=invalid-name
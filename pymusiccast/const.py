@@ -17,6 +17,9 @@ ENDPOINTS = {
     "setVolume": "http://{}/YamahaExtendedControl/v1/{}/setVolume",
 }
 
+UDP_BUFFER_SIZE = 65535  # maximum size of a UDP datagram
+UDP_BATCH_SIZE = 256     # maximum datagrams handed over at once
+
 STATE_UNKNOWN = "unknown"
 STATE_ON = "on"
 STATE_OFF = "off"
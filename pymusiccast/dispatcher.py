@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""This file defines the Dispatcher and Subscription objects."""
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+_LOGGER = logging.getLogger(__name__)
+
+
+MAX_QUEUE = 1000   # events buffered per subscription
+
+
+class Subscription(object):
+    """A callback with its own ordered lane on the executor.
+
+    At most max_queue events wait for delivery. When a slow callback lets
+    the queue fill up, the oldest events are dropped and counted in
+    dropped, so memory stays bounded and the latest state still arrives."""
+    def __init__(self, dispatcher, callback, event_types=None, zone_id=None):
+        super(Subscription, self).__init__()
+        self._dispatcher = dispatcher
+        if dispatcher.executor:
+            self._executor = dispatcher.executor
+            self._own_executor = False
+        else:
+            # a worker of its own: slow callbacks only delay themselves
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="CallbackThread")
+            self._own_executor = True
+        self._callback = callback
+        self._event_types = tuple(event_types) if event_types else None
+        self._zone_id = zone_id
+        self._lock = threading.Lock()
+        self._queue = deque(maxlen=dispatcher.max_queue)  # (time, event)
+        self._running = False
+        self.active = True
+        self.dropped = 0
+        self.calls = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+
+    @property
+    def average_latency(self):
+        """Average seconds from publishing to callback completion."""
+        return self.total_latency / self.calls if self.calls else 0.0
+
+    def matches(self, event):
+        """Check whether event is of interest for this subscription"""
+        if self._event_types and not isinstance(event, self._event_types):
+            return False
+        if self._zone_id and event.zone_id != self._zone_id:
+            return False
+        return True
+
+    def push(self, event):
+        """Queue event and schedule delivery if idle"""
+        with self._lock:
+            if not self.active:
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    _LOGGER.warning(
+                        "Callback too slow, dropped %d events so far: %s",
+                        self.dropped, self._callback)
+            self._queue.append((time.monotonic(), event))
+            if self._running:
+                return
+            self._running = True
+            self._executor.submit(self._deliver)
+
+    def cancel(self):
+        """Stop receiving events"""
+        self._dispatcher.unsubscribe(self)
+
+    def close(self):
+        """Release the worker of this subscription"""
+        with self._lock:
+            self.active = False
+            self._queue.clear()
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    def _deliver(self):
+        """Run the callback for the oldest queued event"""
+        with self._lock:
+            if not self.active or not self._queue:
+                self._queue.clear()
+                self._running = False
+                return
+            published, event = self._queue.popleft()
+
+        try:
+            self._callback(event)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in callback for %s", event)
+
+        latency = time.monotonic() - published
+        with self._lock:
+            self.calls += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self.last_latency = latency
+            if not self.active or not self._queue:
+                self._running = False
+                return
+            # one event per task keeps other lanes from starving
+            self._executor.submit(self._deliver)
+
+
+class Dispatcher(object):
+    """Fans events out to subscribers, preserving order per subscriber.
+
+    Without an executor every subscription runs on a worker of its own."""
+    def __init__(self, executor=None, max_queue=MAX_QUEUE):
+        super(Dispatcher, self).__init__()
+        self.executor = executor
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscriptions = []
+
+    @property
+    def subscriptions(self):
+        """Returns active subscriptions."""
+        return list(self._subscriptions)
+
+    def subscribe(self, callback, event_types=None, zone_id=None):
+        """Register callback and return its Subscription"""
+        subscription = Subscription(self, callback, event_types, zone_id)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove subscription"""
+        with self._lock:
+            self._subscriptions = [
+                sub for sub in self._subscriptions if sub is not subscription]
+        subscription.close()
+
+    def publish(self, event):
+        """Hand event to every matching subscriber"""
+        for subscription in self._subscriptions:
+            if subscription.matches(event):
+                subscription.push(event)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+"""This file defines the events published to subscribers."""
+from collections import namedtuple
+
+PowerChanged = namedtuple(
+    'PowerChanged', ['device_id', 'zone_id', 'power'])
+InputChanged = namedtuple(
+    'InputChanged', ['device_id', 'zone_id', 'input'])
+VolumeChanged = namedtuple(
+    'VolumeChanged', ['device_id', 'zone_id', 'volume', 'max_volume'])
+MuteChanged = namedtuple(
+    'MuteChanged', ['device_id', 'zone_id', 'mute'])
+MediaStatusChanged = namedtuple(
+    'MediaStatusChanged', ['device_id', 'zone_id', 'media_status'])
+PlaybackChanged = namedtuple(
+    'PlaybackChanged', ['device_id', 'zone_id', 'status'])
+
+ZONE_EVENTS = (PowerChanged, InputChanged, VolumeChanged, MuteChanged)
@@ -1,15 +1,40 @@
 #!/usr/bin/env python
 """This file holds helper functions."""
 import json
-import time
 import logging
 import requests
+from .cache import response_cache
+from .const import UDP_BUFFER_SIZE, UDP_BATCH_SIZE
 _LOGGER = logging.getLogger(__name__)
 
 
 def request(url, *args, **kwargs):
     """Do the HTTP Request and return data"""
-    method = kwargs.get('method', 'GET')
+    use_cache = kwargs.pop('cache', True)
+
+    if not response_cache.is_cacheable(url):
+        try:
+            return _request(url, *args, **kwargs)
+        finally:
+            # setters change device state, even if the response got lost
+            response_cache.invalidate_group(url)
+
+    if args or 'params' in kwargs or kwargs.get('method', 'GET') != 'GET':
+        return _request(url, *args, **kwargs)
+
+    if not use_cache or kwargs:
+        # e.g. keep-alive requests with headers always hit the device
+        generation = response_cache.generation(url)
+        data = _request(url, **kwargs)
+        response_cache.set(url, data, generation)
+        return data
+
+    return response_cache.get(url, lambda: _request(url))
+
+
+def _request(url, *args, **kwargs):
+    """Send the HTTP Request to the device"""
+    method = kwargs.pop('method', 'GET')
     timeout = kwargs.pop('timeout', 10)  # hass default timeout
     req = requests.request(method, url, *args, timeout=timeout, **kwargs)
     data = req.json()
@@ -18,15 +43,14 @@ def request(url, *args, **kwargs):
 
 
 def message_worker(device):
-    """Loop through messages and pass them on to right device"""
+    """Loop through message batches and pass them on to right device"""
     _LOGGER.debug("Starting Worker Thread.")
     msg_q = device.messages
 
     while True:
+        batch = msg_q.get()     # blocks until the socket thread delivers
 
-        if not msg_q.empty():
-            message = msg_q.get()
-
+        for message in batch:
             data = {}
             try:
                 data = json.loads(message.decode("utf-8"))
@@ -39,20 +63,57 @@ def message_worker(device):
                     device.handle_event(data)
                 else:
                     _LOGGER.warning("Received message for unknown device.")
-            msg_q.task_done()
+        msg_q.task_done()
+
 
-        time.sleep(0.2)
+def receive_batch(sock, buf, max_count=UDP_BATCH_SIZE):
+    """Wait for a datagram, then drain up to max_count pending ones.
+
+    Returns None once the socket has been shut down."""
+    view = memoryview(buf)
+    nbytes, addr = sock.recvfrom_into(buf)  # blocks until data arrives
+    if addr is None:
+        return None
+    data = view[:nbytes].tobytes()
+    _LOGGER.debug("received message: %s from %s", data, addr)
+    batch = [data]
+
+    sock.setblocking(False)
+    try:
+        while len(batch) < max_count:
+            try:
+                nbytes, addr = sock.recvfrom_into(buf)
+            except BlockingIOError:
+                break
+            except OSError as err:
+                # keep what we already have
+                _LOGGER.error(err)
+                break
+            if addr is None:
+                break
+            data = view[:nbytes].tobytes()
+            _LOGGER.debug("received message: %s from %s", data, addr)
+            batch.append(data)
+    finally:
+        if sock.fileno() != -1:
+            sock.setblocking(True)
+    return batch
 
 
 def socket_worker(sock, msg_q):
     """Socket Loop that fills message queue"""
     _LOGGER.debug("Starting Socket Thread.")
+    buf = bytearray(UDP_BUFFER_SIZE)    # large enough for any datagram
     while True:
         try:
-            data, addr = sock.recvfrom(1024)    # buffer size is 1024 bytes
+            batch = receive_batch(sock, buf)
         except OSError as err:
-            _LOGGER.error(err)
-        else:
-            _LOGGER.debug("received message: %s from %s", data, addr)
-            msg_q.put(data)
-        time.sleep(0.2)
+            if sock.fileno() == -1:
+                batch = None
+            else:
+                _LOGGER.error(err)
+                continue
+        if batch is None:
+            _LOGGER.debug("Socket closed, stopping Socket Thread.")
+            return
+        msg_q.put(batch)
@@ -7,8 +7,9 @@ _LOGGER = logging.getLogger(__name__)
 
 class MediaStatus(object):
     """docstring for MediaStatus"""
-    def __init__(self, data, host):
+    def __init__(self, data, host, album_art_cache=None):
         super(MediaStatus, self).__init__()
+        self.album_art_cache = album_art_cache
         self.received = datetime.utcnow()
         self.host = host
         self.play_time = 0
@@ -34,6 +35,18 @@ class MediaStatus(object):
         """Image url of current playing media."""
         return "http://{}{}".format(self.host, self.albumart_url)
 
+    @property
+    def media_image(self):
+        """Image bytes of current playing media if already cached.
+
+        Never blocks: on a miss the image is fetched in the background."""
+        if self.album_art_cache is None:
+            return None
+        data = self.album_art_cache.peek(self.host, self.albumart_url)
+        if data is None:
+            self.album_art_cache.prefetch(self.host, self.albumart_url)
+        return data
+
     @property
     def media_artist(self):
         """Artist of current playing media, music track only."""
@@ -2,6 +2,9 @@
 """This is a docstring."""
 import logging
 from .const import ENDPOINTS, STATE_ON, STATE_OFF
+from .events import (
+    PowerChanged, InputChanged, VolumeChanged, MuteChanged, ZONE_EVENTS
+)
 from .helpers import request
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,6 +54,32 @@ class Zone(object):
         """Sets source_list."""
         self._yamaha.source_list = source_list
 
+    def subscribe(self, callback, event_types=None):
+        """Subscribe callback to events of this zone"""
+        return self.receiver.subscribe(
+            callback, event_types or ZONE_EVENTS, zone_id=self.zone_id)
+
+    def publish_changes(self, old_status, new_status):
+        """Publish events for items that changed"""
+        device_id = self.receiver.device_id
+        changed = [
+            key for key in ('power', 'input', 'volume', 'max_volume', 'mute')
+            if key in new_status and new_status[key] != old_status.get(key)]
+
+        if 'power' in changed:
+            self.receiver.publish(PowerChanged(
+                device_id, self.zone_id, new_status['power']))
+        if 'input' in changed:
+            self.receiver.publish(InputChanged(
+                device_id, self.zone_id, new_status['input']))
+        if 'volume' in changed or 'max_volume' in changed:
+            self.receiver.publish(VolumeChanged(
+                device_id, self.zone_id, new_status.get('volume'),
+                new_status.get('max_volume')))
+        if 'mute' in changed:
+            self.receiver.publish(MuteChanged(
+                device_id, self.zone_id, new_status['mute']))
+
     def handle_message(self, message):
         """Process UDP messages"""
         if self._yamaha:
@@ -79,7 +108,12 @@ class Zone(object):
         else:
             _LOGGER.debug("No yamaha-obj found")
 
-    def update_status(self, new_status=None):
+    @property
+    def yamaha_device(self):
+        """Returns the device in HASS."""
+        return self._yamaha
+
+    def update_status(self, new_status=None, notify=True):
         """Updates the zone status."""
         _LOGGER.debug("update_status: Zone %s", self.zone_id)
 
@@ -109,11 +143,17 @@ class Zone(object):
             _LOGGER.debug("is_equal: %s", old_status == new_status)
 
             if new_status != old_status:
+                self.publish_changes(old_status, new_status)
                 self.handle_message(new_status)
                 self._status_sent = False
                 self.status = new_status
 
-        if not self._status_sent:
+        if notify:
+            self.send_status()
+
+    def send_status(self, force=False):
+        """Update HASS unless the current status was sent already."""
+        if force or not self._status_sent:
             self._status_sent = self.update_hass()
 
     def update_hass(self):
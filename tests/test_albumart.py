@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Tests for the album art cache."""
+import os
+import threading
+import time
+from pymusiccast.albumart import AlbumArtCache
+from pymusiccast.media_status import MediaStatus
+
+
+class FakeAlbumArtCache(AlbumArtCache):
+    """AlbumArtCache serving 100 bytes per image without network"""
+    def __init__(self, *args, delay=0, **kwargs):
+        self.calls = []
+        self.delay = delay
+        super(FakeAlbumArtCache, self).__init__(*args, **kwargs)
+
+    def fetch(self, host, albumart_url):
+        self.calls.append(albumart_url)
+        time.sleep(self.delay)
+        return albumart_url[-1:].encode("utf-8") * 100
+
+
+def test_memory_lru_evicts_by_bytes():
+    """Least recently used images go first once max_bytes is exceeded."""
+    cache = FakeAlbumArtCache(max_bytes=250)
+    cache.get('host', '/a')
+    cache.get('host', '/b')
+    cache.get('host', '/a')     # a is now more recent than b
+    cache.get('host', '/c')
+
+    assert cache.peek('host', '/a') == b'a' * 100
+    assert cache.peek('host', '/b') is None
+    assert cache.peek('host', '/c') == b'c' * 100
+    assert cache.calls == ['/a', '/b', '/c']
+
+
+def test_disk_adopts_only_own_files_and_evicts(tmp_path):
+    """Existing cache files are reused, foreign files are never touched."""
+    notes = tmp_path / 'my_notes.txt'
+    notes.write_bytes(b'x' * 500)
+    cache = FakeAlbumArtCache(cache_dir=str(tmp_path), max_disk_bytes=250)
+    cache.get('host', '/a')
+    cache.get('host', '/b')
+
+    # a new instance serves from disk instead of fetching again
+    cache = FakeAlbumArtCache(cache_dir=str(tmp_path), max_disk_bytes=250)
+    assert cache.get('host', '/a') == b'a' * 100
+    assert cache.calls == []
+
+    cache.get('host', '/c')     # evicts b, the least recently used
+    keys = {cache.make_key('host', url) for url in ('/a', '/b', '/c')}
+    files = set(os.listdir(str(tmp_path)))
+    assert files & keys == {
+        cache.make_key('host', '/a'), cache.make_key('host', '/c')}
+
+    cache.clear()
+    assert os.listdir(str(tmp_path)) == ['my_notes.txt']
+    assert notes.read_bytes() == b'x' * 500
+
+
+def test_concurrent_gets_share_one_fetch():
+    """Identical concurrent requests cause a single download."""
+    cache = FakeAlbumArtCache(max_bytes=50, delay=0.2)   # too big for memory
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get('h', '/a')))
+        for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.calls == ['/a']
+    assert results == [b'a' * 100] * 10
+
+
+def test_make_key_separates_host_and_url():
+    """Host and url parts can't run into each other."""
+    assert (AlbumArtCache.make_key('10.0.0.1', '1/a.jpg') !=
+            AlbumArtCache.make_key('10.0.0.11', '/a.jpg'))
+
+
+def test_media_image_does_not_block():
+    """A miss returns None at once and prefetches in the background."""
+    cache = FakeAlbumArtCache(delay=0.5)
+    media_status = MediaStatus({'albumart_url': '/a'}, 'host', cache)
+
+    start = time.monotonic()
+    assert media_status.media_image is None
+    assert media_status.media_image is None
+    assert time.monotonic() - start < 0.1
+
+    time.sleep(0.7)
+    assert media_status.media_image == b'a' * 100
+    assert cache.calls == ['/a']
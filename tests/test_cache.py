@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""Tests for the GET response cache."""
+import threading
+import time
+from unittest import mock
+import pytest
+from pymusiccast import helpers
+from pymusiccast.cache import ResponseCache
+
+BASE = 'http://host/YamahaExtendedControl/v1/'
+STATUS = BASE + 'main/getStatus'
+PLAY_INFO = BASE + 'netusb/getPlayInfo'
+
+
+def run_threads(target, count):
+    """Run target in count threads and wait for all of them."""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_gets_share_one_fetch():
+    """N concurrent callers cause one fetch and count as hits."""
+    cache = ResponseCache()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'volume': 10}
+
+    run_threads(lambda: results.append(cache.get(STATUS, fetch)), 10)
+
+    assert len(calls) == 1
+    assert results == [{'volume': 10}] * 10
+    assert (cache.hits, cache.misses) == (9, 1)
+    assert cache.get(STATUS, fetch) == {'volume': 10}
+    assert (cache.hits, cache.misses) == (10, 1)
+    assert cache.hit_rate == pytest.approx(10 / 11)
+
+
+def test_callers_get_copies():
+    """Changing a returned response leaves the cached one alone."""
+    cache = ResponseCache()
+    cache.get(STATUS, lambda: {'input_list': ['b', 'a']})['input_list'].sort()
+    assert cache.get(STATUS, None) == {'input_list': ['b', 'a']}
+
+
+def test_failure_is_shared_by_all_waiters():
+    """A failing fetch settles every concurrent caller at once."""
+    cache = ResponseCache()
+    calls = []
+    errors = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.3)
+        raise OSError('timeout')
+
+    def caller():
+        start = time.monotonic()
+        try:
+            cache.get(STATUS, fetch)
+        except OSError as err:
+            errors.append((str(err), time.monotonic() - start))
+
+    run_threads(caller, 5)
+
+    assert len(calls) == 1
+    assert len(errors) == 5
+    assert all(msg == 'timeout' and took < 0.5 for msg, took in errors)
+
+
+def test_entries_expire():
+    """Entries are refetched after ttl."""
+    cache = ResponseCache(ttl=0.05)
+    cache.get(STATUS, lambda: {'volume': 1})
+    time.sleep(0.1)
+    assert cache.get(STATUS, lambda: {'volume': 2}) == {'volume': 2}
+
+
+@pytest.mark.parametrize('update', [
+    lambda cache: cache.invalidate(STATUS),
+    lambda cache: cache.invalidate_group(BASE + 'main/setVolume'),
+    lambda cache: cache.merge(STATUS, {'volume': 12}),
+])
+def test_in_flight_result_is_not_stored_after_update(update):
+    """A fetch that started before an update doesn't refill the cache."""
+    cache = ResponseCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def stale_fetch():
+        started.set()
+        release.wait()
+        return {'volume': 10}
+
+    thread = threading.Thread(target=cache.get, args=(STATUS, stale_fetch))
+    thread.start()
+    started.wait()
+    update(cache)
+    release.set()
+    thread.join()
+
+    assert cache.get(STATUS, lambda: {'volume': 12}) == {'volume': 12}
+
+
+def test_merge_updates_cached_entry():
+    """UDP updates are merged into existing entries."""
+    cache = ResponseCache()
+    cache.get(STATUS, lambda: {'volume': 10, 'power': 'on'})
+    cache.merge(STATUS, {'volume': 12})
+    assert cache.get(STATUS, None) == {'volume': 12, 'power': 'on'}
+
+
+@pytest.fixture(name='response_cache')
+def fixture_response_cache():
+    """Fresh cache used by helpers.request."""
+    cache = ResponseCache()
+    with mock.patch.object(helpers, 'response_cache', cache):
+        yield cache
+
+
+def test_failing_setter_invalidates(response_cache):
+    """A setter that times out may still have changed the device."""
+    response_cache.set(STATUS, {'volume': 10})
+
+    with mock.patch.object(helpers, '_request', side_effect=OSError):
+        with pytest.raises(OSError):
+            helpers.request(BASE + 'main/setVolume', params={'volume': 12})
+
+    with mock.patch.object(helpers, '_request', return_value={'volume': 12}):
+        assert helpers.request(STATUS) == {'volume': 12}
+
+
+def test_set_input_invalidates_netusb(response_cache):
+    """setInput changes what netusb plays, too."""
+    response_cache.set(STATUS, {'input': 'tuner'})
+    response_cache.set(PLAY_INFO, {'artist': 'old'})
+    response_cache.set(BASE + 'zone2/getStatus', {'input': 'tuner'})
+
+    with mock.patch.object(helpers, '_request', return_value={}):
+        helpers.request(BASE + 'main/setInput', params={'input': 'server'})
+
+    with mock.patch.object(helpers, '_request', return_value={'new': 1}):
+        assert helpers.request(STATUS) == {'new': 1}
+        assert helpers.request(PLAY_INFO) == {'new': 1}
+        assert helpers.request(BASE + 'zone2/getStatus') == {
+            'input': 'tuner'}
+
+
+def test_setter_invalidates_only_its_group(response_cache):
+    """setVolume on main leaves other zones and netusb cached."""
+    response_cache.set(STATUS, {'volume': 10})
+    response_cache.set(PLAY_INFO, {'artist': 'a'})
+
+    with mock.patch.object(helpers, '_request', return_value={}):
+        helpers.request(BASE + 'main/setVolume', params={'volume': 12})
+
+    with mock.patch.object(helpers, '_request', return_value={'new': 1}):
+        assert helpers.request(STATUS) == {'new': 1}
+        assert helpers.request(PLAY_INFO) == {'artist': 'a'}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""Tests for the subscription API."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pymusiccast.dispatcher import Dispatcher
+from pymusiccast.events import PowerChanged, VolumeChanged
+
+
+def wait_for(condition, timeout=5):
+    """Poll condition until it holds or timeout passes."""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.01)
+
+
+def test_ordering_per_subscription_on_shared_executor():
+    """Every subscriber sees events in publish order."""
+    executor = ThreadPoolExecutor(max_workers=4)
+    dispatcher = Dispatcher(executor)
+    received = [[] for _ in range(3)]
+    for events in received:
+        dispatcher.subscribe(
+            lambda event, events=events: events.append(event.volume))
+
+    for volume in range(500):
+        dispatcher.publish(VolumeChanged('dev', 'main', volume, 100))
+
+    wait_for(lambda: all(len(events) == 500 for events in received))
+    assert all(events == list(range(500)) for events in received)
+    executor.shutdown()
+
+
+def test_filters():
+    """zone_id and event_types narrow down delivered events."""
+    dispatcher = Dispatcher()
+    zone2, power = [], []
+    dispatcher.subscribe(zone2.append, zone_id='zone2')
+    dispatcher.subscribe(power.append, event_types=[PowerChanged])
+
+    dispatcher.publish(PowerChanged('dev', 'main', 'on'))
+    dispatcher.publish(VolumeChanged('dev', 'zone2', 10, 100))
+    dispatcher.publish(PowerChanged('dev', 'zone2', 'standby'))
+
+    wait_for(lambda: len(zone2) == 2 and len(power) == 2)
+    assert [event.zone_id for event in zone2] == ['zone2', 'zone2']
+    assert all(isinstance(event, PowerChanged) for event in power)
+
+
+def test_latency_counters():
+    """Each delivery is counted with its publish-to-done latency."""
+    dispatcher = Dispatcher()
+    subscription = dispatcher.subscribe(lambda event: time.sleep(0.05))
+
+    for _ in range(3):
+        dispatcher.publish(PowerChanged('dev', 'main', 'on'))
+
+    wait_for(lambda: subscription.calls == 3)
+    assert subscription.max_latency >= 0.15    # third waited for the others
+    assert subscription.last_latency == subscription.max_latency
+    assert 0.05 <= subscription.average_latency <= subscription.max_latency
+
+
+def test_slow_subscriber_does_not_delay_others():
+    """Subscriptions without an executor get a worker of their own."""
+    dispatcher = Dispatcher()
+    fast = []
+    for _ in range(4):
+        dispatcher.subscribe(lambda event: time.sleep(1))
+    dispatcher.subscribe(fast.append)
+
+    dispatcher.publish(PowerChanged('dev', 'main', 'on'))
+    wait_for(lambda: fast, timeout=0.5)
+
+
+def test_no_delivery_after_unsubscribe():
+    """Queued and later events are dropped once unsubscribed."""
+    dispatcher = Dispatcher()
+    release = threading.Event()
+    received = []
+
+    def callback(event):
+        release.wait()
+        received.append(event)
+
+    subscription = dispatcher.subscribe(callback)
+    dispatcher.publish(PowerChanged('dev', 'main', 'on'))     # in callback
+    dispatcher.publish(PowerChanged('dev', 'main', 'standby'))  # queued
+    time.sleep(0.05)
+    dispatcher.unsubscribe(subscription)
+    dispatcher.publish(PowerChanged('dev', 'main', 'on'))
+    release.set()
+
+    time.sleep(0.1)
+    assert [event.power for event in received] == ['on']
+    assert dispatcher.subscriptions == []
+
+
+def test_queue_is_bounded():
+    """A stuck callback drops the oldest events instead of growing."""
+    dispatcher = Dispatcher(max_queue=10)
+    release = threading.Event()
+    received = []
+
+    def callback(event):
+        release.wait()
+        received.append(event.volume)
+
+    subscription = dispatcher.subscribe(callback)
+    dispatcher.publish(VolumeChanged('dev', 'main', -1, 100))
+    time.sleep(0.05)    # -1 is now being delivered
+    for volume in range(100):
+        dispatcher.publish(VolumeChanged('dev', 'main', volume, 100))
+    release.set()
+
+    wait_for(lambda: len(received) == 11)
+    assert subscription.dropped == 90
+    assert received == [-1] + list(range(90, 100))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Stress test for the UDP receive path."""
+import json
+import queue
+import socket
+import threading
+import time
+from pymusiccast.const import UDP_BATCH_SIZE
+from pymusiccast.helpers import socket_worker
+
+DATAGRAMS = 5000
+WINDOW = 50     # datagrams in flight; stays far below a default rmem_max
+
+
+def test_socket_worker_receives_large_datagrams_intact():
+    """Thousands of datagrams over 1024 bytes per second arrive intact."""
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    msg_q = queue.Queue()
+    worker = threading.Thread(
+        target=socket_worker, args=(receiver, msg_q,), daemon=True)
+    worker.start()
+
+    try:
+        messages = [
+            json.dumps({"device_id": "test", "seq": seq, "pad": "x" * 1100})
+            .encode("utf-8") for seq in range(DATAGRAMS)]
+        assert all(len(message) > 1024 for message in messages)
+
+        received = []
+        start = time.monotonic()
+        for seq, message in enumerate(messages):
+            sender.sendto(message, receiver.getsockname())
+            if seq % WINDOW == WINDOW - 1 or seq == DATAGRAMS - 1:
+                # let the receive path catch up before sending more
+                while len(received) <= seq:
+                    batch = msg_q.get(timeout=5)
+                    assert 0 < len(batch) <= UDP_BATCH_SIZE
+                    received.extend(batch)
+        elapsed = time.monotonic() - start
+
+        assert received == messages
+        assert DATAGRAMS / elapsed > 1000
+    finally:
+        sender.close()
+        try:
+            receiver.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass    # not connected, but blocked receivers are woken up
+        receiver.close()
+        worker.join(timeout=5)
+
+    assert not worker.is_alive()